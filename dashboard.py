@@ -154,6 +154,119 @@ def load_data():
         st.error(f"Error al cargar datos: {e}")
         return None, None
 
+# --- SIMULADOR DE ESCENARIOS (TRASLADOS ENTRE REGÍMENES) ---
+REGIMENES = ['Contributivo', 'Subsidiado', 'Excepción']
+
+def aplicar_traslado(matriz, totales, mascara, origen, destino, fraccion):
+    # Traslada una fracción del régimen origen al destino en las filas seleccionadas.
+    # Solo se calcula el delta: las filas no seleccionadas y el total por fila no cambian,
+    # y los totales nacionales se actualizan sumando el delta en lugar de recalcularse.
+    i_o, i_d = REGIMENES.index(origen), REGIMENES.index(destino)
+    delta = np.zeros(len(matriz))
+    delta[mascara] = matriz[mascara, i_o] * fraccion
+    nueva = matriz.copy()
+    nueva[:, i_o] -= delta
+    nueva[:, i_d] += delta
+    nuevos_totales = totales.copy()
+    nuevos_totales[i_o] -= delta.sum()
+    nuevos_totales[i_d] += delta.sum()
+    return nueva, nuevos_totales, delta
+
+@st.cache_data
+def evaluar_grilla(valores_origen, total_destino, total_sistema, fracciones, tamanos):
+    # Evalúa todos los escenarios (fracción x Top-k entidades) en una sola operación vectorizada.
+    # valores_origen debe venir ordenado de mayor a menor Total, de modo que la suma acumulada
+    # da el volumen trasladable para cada Top-k sin recorrer los escenarios uno a uno.
+    acumulado = np.concatenate([[0.0], np.cumsum(valores_origen)])
+    trasladado = np.outer(fracciones, acumulado[tamanos])
+    return (total_destino + trasladado) / total_sistema * 100
+
+def mostrar_escenarios(df_base, col_entidad, etiqueta, top_n, prefijo):
+    st.markdown(f"## 🔀 Simulador de Escenarios por {etiqueta}")
+    st.markdown("*Traslados parametrizados de afiliados entre regímenes (el total de cada entidad se conserva)*")
+
+    df_base = df_base.sort_values(by="Total", ascending=False).reset_index(drop=True)
+    matriz = df_base[REGIMENES].fillna(0).to_numpy(dtype=float)
+    totales = matriz.sum(axis=0)
+    total_sistema = df_base['Total'].sum()
+
+    col_p1, col_p2, col_p3 = st.columns(3)
+    with col_p1:
+        origen = st.selectbox("Régimen origen:", REGIMENES, index=1, key=f"{prefijo}_origen")
+    with col_p2:
+        destino = st.selectbox("Régimen destino:", [r for r in REGIMENES if r != origen], key=f"{prefijo}_destino")
+    with col_p3:
+        pct_traslado = st.slider("% del régimen origen trasladado:", 0.0, 50.0, 5.0, 0.5, key=f"{prefijo}_pct")
+
+    seleccion = st.multiselect(
+        f"{etiqueta} incluidas en el traslado:", df_base[col_entidad].tolist(),
+        default=df_base[col_entidad].head(top_n).tolist(), key=f"{prefijo}_seleccion"
+    )
+    mascara = df_base[col_entidad].isin(seleccion).to_numpy()
+
+    nueva, nuevos_totales, delta = aplicar_traslado(matriz, totales, mascara, origen, destino, pct_traslado / 100)
+
+    # KPIs del escenario frente a la línea base
+    pct_base = totales / total_sistema * 100
+    pct_nuevo = nuevos_totales / total_sistema * 100
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric("🔀 Afiliados Trasladados", f"{delta.sum():,.0f}")
+    for col, regimen, i in zip([col2, col3, col4], REGIMENES, range(3)):
+        with col:
+            st.metric(f"% {regimen}", f"{pct_nuevo[i]:.2f}%", f"{pct_nuevo[i] - pct_base[i]:+.2f} pp")
+
+    st.divider()
+
+    # Tabla de entidades afectadas con participaciones y ranking del régimen destino
+    i_o, i_d = REGIMENES.index(origen), REGIMENES.index(destino)
+    df_esc = df_base[[col_entidad, 'Total']].copy()
+    df_esc[f'{origen} (antes)'] = matriz[:, i_o]
+    df_esc[f'{origen} (después)'] = nueva[:, i_o]
+    df_esc[f'{destino} (antes)'] = matriz[:, i_d]
+    df_esc[f'{destino} (después)'] = nueva[:, i_d]
+    df_esc[f'% {destino} (después)'] = nueva[:, i_d] / df_base['Total'].to_numpy() * 100
+    df_esc[f'Ranking {destino} (antes)'] = pd.Series(matriz[:, i_d]).rank(ascending=False, method='min').astype(int)
+    df_esc[f'Ranking {destino} (después)'] = pd.Series(nueva[:, i_d]).rank(ascending=False, method='min').astype(int)
+    df_esc = df_esc[mascara]
+
+    st.subheader(f"📋 {etiqueta} Afectadas")
+    st.dataframe(
+        df_esc.style.format({
+            'Total': "{:,.0f}",
+            f'{origen} (antes)': "{:,.0f}",
+            f'{origen} (después)': "{:,.0f}",
+            f'{destino} (antes)': "{:,.0f}",
+            f'{destino} (después)': "{:,.0f}",
+            f'% {destino} (después)': "{:.1f}"
+        }),
+        use_container_width=True,
+        height=350
+    )
+
+    st.divider()
+
+    # Grilla de escenarios: % trasladado vs. cantidad de entidades (Top-k por Total)
+    st.subheader("🗺️ Grilla de Escenarios")
+    col_h1, col_h2 = st.columns(2)
+    with col_h1:
+        pct_max = st.slider("% máximo trasladado en la grilla:", 5, 100, 30, 5, key=f"{prefijo}_pct_max")
+    with col_h2:
+        paso = st.select_slider("Paso del % trasladado:", [0.5, 1.0, 2.0, 5.0], value=1.0, key=f"{prefijo}_paso")
+
+    fracciones = np.arange(0, pct_max + paso / 2, paso)
+    tamanos = np.arange(1, len(df_base) + 1)
+    grilla = evaluar_grilla(matriz[:, i_o], totales[i_d], total_sistema, fracciones / 100, tamanos)
+
+    fig_heat = px.imshow(
+        grilla, x=tamanos, y=fracciones, origin='lower', aspect='auto',
+        color_continuous_scale="Teal",
+        labels=dict(x=f"Top-k {etiqueta} (por Total)", y="% trasladado", color=f"% {destino}")
+    )
+    fig_heat.update_layout(plot_bgcolor="white", height=500)
+    st.plotly_chart(fig_heat, use_container_width=True)
+    st.caption(f"{grilla.size:,} escenarios evaluados: % nacional del régimen {destino} tras trasladar desde {origen}.")
+
 # Cargar los datos
 df_dept, df_eps = load_data()
 
@@ -268,7 +381,7 @@ st.markdown("---")
 # ANÁLISIS POR DEPARTAMENTO
 # ==========================================
 if analysis_mode == "📊 Por Departamento":
-    tab1, tab2, tab3, tab4, tab5 = st.tabs(["📊 VISIÓN GENERAL", "💼 R. CONTRIBUTIVO", "🤝 R. SUBSIDIADO", "⚠️ R. EXCEPCIÓN", "📋 DATOS"])
+    tab1, tab2, tab3, tab4, tab5, tab6 = st.tabs(["📊 VISIÓN GENERAL", "💼 R. CONTRIBUTIVO", "🤝 R. SUBSIDIADO", "⚠️ R. EXCEPCIÓN", "📋 DATOS", "🔀 ESCENARIOS"])
     
     # --- PESTAÑA 1: VISIÓN GENERAL ---
     with tab1:
@@ -479,12 +592,16 @@ if analysis_mode == "📊 Por Departamento":
                 file_name='datos_departamentos_oct2025.csv',
                 mime='text/csv'
             )
+    
+    # --- PESTAÑA 6: ESCENARIOS ---
+    with tab6:
+        mostrar_escenarios(df_dept, 'Región', 'Regiones', top_n, 'esc_dept')
 
 # ==========================================
 # ANÁLISIS POR EPS
 # ==========================================
 elif analysis_mode == "🏥 Por EPS":
-    tab1, tab2, tab3 = st.tabs(["🏥 VISIÓN GENERAL EPS", "⚖️ COMPARACIÓN DE REGÍMENES", "📋 DATOS"])
+    tab1, tab2, tab3, tab4 = st.tabs(["🏥 VISIÓN GENERAL EPS", "⚖️ COMPARACIÓN DE REGÍMENES", "📋 DATOS", "🔀 ESCENARIOS"])
     
     # --- PESTAÑA 1: VISIÓN GENERAL EPS ---
     with tab1:
@@ -658,6 +775,16 @@ elif analysis_mode == "🏥 Por EPS":
             file_name='datos_eps_oct2025.csv',
             mime='text/csv'
         )
+    
+    # --- PESTAÑA 4: ESCENARIOS EPS ---
+    with tab4:
+        # Reconstruir afiliados por régimen a partir de los porcentajes de cada EPS
+        df_eps_reg = df_eps[['EPS']].copy()
+        df_eps_reg['Total'] = df_eps['Total Afiliados']
+        df_eps_reg['Contributivo'] = df_eps['Total Afiliados'] * df_eps['% Contributivo'].fillna(0)
+        df_eps_reg['Subsidiado'] = df_eps['Total Afiliados'] * df_eps['% Subsidiado'].fillna(0)
+        df_eps_reg['Excepción'] = df_eps['Total Afiliados'] * df_eps['% Excepción'].fillna(0)
+        mostrar_escenarios(df_eps_reg, 'EPS', 'EPS', top_n, 'esc_eps')
 
 # --- PIE DE PÁGINA ---
 st.markdown("---")